@@ -8,22 +8,53 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 from cloudinary.uploader import upload
-from . import crud, models, schemas, database, utils
+from . import crud, models, schemas, database
 from .config import settings
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    """
+    Get the user authenticated by the bearer access token.
+
+    Args:
+        token (str): Access token from the Authorization header.
+        db (Session): Database session dependency.
+
+    Returns:
+        models.User: The authenticated user.
+
+    Raises:
+        HTTPException: If the token is invalid or the user is not found.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    email = payload.get("sub")
+    if email is None:
+        raise credentials_exception
+    user = crud.get_user_by_email(db, email=email)
+    if user is None:
+        raise credentials_exception
+    return user
+
 @router.post("/register/", response_model=schemas.User, dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_db), background_tasks: BackgroundTasks):
+def register_user(user: schemas.UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(database.get_db)):
     """
     Register a new user.
 
     Args:
         user (schemas.UserCreate): User data for registration.
-        db (Session): Database session dependency.
         background_tasks (BackgroundTasks): Background tasks dependency.
+        db (Session): Database session dependency.
 
     Returns:
         schemas.User: The registered user.
@@ -35,10 +66,9 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_d
     if db_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     
-    hashed_password = utils.hash_password(user.password)
     new_user = crud.create_user(db=db, user=user)
     
-    send_verification_email.delay(new_user.email, new_user.id)
+    background_tasks.add_task(send_verification_email, new_user.email, new_user.id)
     
     return new_user
 
@@ -73,7 +103,6 @@ def verify_email(token: str, db: Session = Depends(database.get_db)):
     except JWTError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
 
-@background_tasks.add_task
 def send_verification_email(email_to: str, user_id: int):
     """
     Send verification email to the user.
@@ -120,7 +149,7 @@ def update_avatar(current_user: models.User, avatar_url: str, db: Session):
     Returns:
         models.User: Updated user model.
     """
-    upload_response = cloudinary.uploader.upload(avatar_url)
+    upload_response = upload(avatar_url)
     current_user.avatar_url = upload_response['secure_url']
     db.commit()
     db.refresh(current_user)
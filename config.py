@@ -13,6 +13,22 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 CLOUDINARY_URL = os.getenv("CLOUDINARY_URL", "")
 
+# Номери без коду країни нормалізуються до E.164 з цим кодом
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "380")
+PHONE_LOOKUP_CACHE_SIZE = int(os.getenv("PHONE_LOOKUP_CACHE_SIZE", 1024))
+PHONE_LOOKUP_CACHE_TTL_SECONDS = float(os.getenv("PHONE_LOOKUP_CACHE_TTL_SECONDS", 60))
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Скільки зберігається перша відповідь на запит з Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+# Скільки повторний запит чекає на завершення оригінального
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10))
+# Час життя мітки "в обробці"; власник продовжує її, поки виконується запит,
+# тож значення має лише перевищувати таймаут запиту на випадок падіння процесу
+IDEMPOTENCY_LOCK_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_TTL_SECONDS", 120))
+
 # Ваші дані для електронної пошти із .env
 MAIL_USERNAME = os.getenv("MAIL_USERNAME", "your-email@example.com")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "your-email-password")
@@ -51,6 +67,15 @@ class Settings:
         self.MAIL_TLS = MAIL_TLS
         self.MAIL_SSL = MAIL_SSL
         self.CLOUDINARY_URL = CLOUDINARY_URL
+        self.DEFAULT_COUNTRY_CODE = DEFAULT_COUNTRY_CODE
+        self.PHONE_LOOKUP_CACHE_SIZE = PHONE_LOOKUP_CACHE_SIZE
+        self.PHONE_LOOKUP_CACHE_TTL_SECONDS = PHONE_LOOKUP_CACHE_TTL_SECONDS
+        self.MIGRATION_LOCK_TIMEOUT = MIGRATION_LOCK_TIMEOUT
+        self.REDIS_HOST = REDIS_HOST
+        self.REDIS_PORT = REDIS_PORT
+        self.IDEMPOTENCY_TTL_SECONDS = IDEMPOTENCY_TTL_SECONDS
+        self.IDEMPOTENCY_WAIT_SECONDS = IDEMPOTENCY_WAIT_SECONDS
+        self.IDEMPOTENCY_LOCK_TTL_SECONDS = IDEMPOTENCY_LOCK_TTL_SECONDS
 
 settings = Settings()
 
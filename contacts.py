@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from . import auth, crud, database, idempotency, schemas
+
+router = APIRouter()
+
+def _create_contact(db: Session, contact: schemas.ContactCreate) -> dict:
+    # Обидва шляхи (з Idempotency-Key і без) серіалізують контакт однаково
+    return jsonable_encoder(schemas.Contact.model_validate(crud.create_contact(db, contact)))
+
+@router.post("/contacts/", response_model=schemas.Contact)
+async def create_contact(contact: schemas.ContactCreate, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    """
+    Створення нового контакту.
+
+    Якщо передано заголовок Idempotency-Key, перша відповідь зберігається в Redis,
+    і повтори запиту з тим самим ключем отримують її без звернення до бази даних.
+    Повтор, що надійшов під час обробки оригінального запиту, чекає на його результат.
+
+    Args:
+        contact (schemas.ContactCreate): Об'єкт, що містить дані для створення нового контакту.
+        idempotency_key (Optional[str], optional): Значення заголовка Idempotency-Key.
+        current_user (schemas.User, optional): Поточний користувач. За замовчуванням отримується через функцію auth.get_current_user.
+        db (Session, optional): Сесія бази даних SQLAlchemy. За замовчуванням отримується через функцію database.get_db.
+
+    Returns:
+        schemas.Contact: Об'єкт, що містить створений контакт.
+
+    Raises:
+        HTTPException: Якщо користувач не авторизований, Idempotency-Key вже використано
+            з іншими даними або оригінальний запит ще виконується.
+    """
+    if idempotency_key is None:
+        return await run_in_threadpool(_create_contact, db, contact)
+
+    result = await idempotency.execute(
+        f"contacts:{current_user.id}",
+        idempotency_key,
+        idempotency.request_fingerprint(contact.model_dump_json()),
+        lambda: _create_contact(db, contact),
+    )
+    headers = {"Idempotent-Replayed": "true"} if result["replayed"] else None
+    return JSONResponse(content=result["body"], status_code=result["status_code"], headers=headers)
+
+@router.get("/contacts/lookup/", response_model=schemas.Contact)
+def lookup_contact_by_phone(phone: str, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    """
+    Зворотний пошук контакту за номером телефону.
+
+    Номер нормалізується до формату E.164, тому "+380 67 123-45-67" і "0671234567" знаходять один і той самий контакт.
+
+    Args:
+        phone (str): Номер телефону в довільному форматі.
+        current_user (schemas.User, optional): Поточний користувач. За замовчуванням отримується через функцію auth.get_current_user.
+        db (Session, optional): Сесія бази даних SQLAlchemy. За замовчуванням отримується через функцію database.get_db.
+
+    Returns:
+        schemas.Contact: Знайдений контакт.
+
+    Raises:
+        HTTPException: Якщо контакт з таким номером не знайдено.
+    """
+    contact_data = crud.lookup_contact_by_phone(db, phone)
+    if contact_data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    return contact_data
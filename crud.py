@@ -1,10 +1,63 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 from sqlalchemy.orm import Session
 from . import models, schemas
 from .models import User
+from .config import settings
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Нормалізований номер (E.164) -> (час закінчення, дані контакту) для найчастіших зворотних пошуків.
+# Ендпоінти виконуються в пулі потоків, тому всі звернення до кешу йдуть під блокуванням.
+_phone_lookup_cache = OrderedDict()
+_phone_lookup_lock = threading.Lock()
+
+def normalize_phone(phone_number: Optional[str], default_country_code: Optional[str] = None) -> Optional[str]:
+    """
+    Привести номер телефону до формату E.164 (наприклад, "+380671234567").
+
+    Номер без коду країни ("067 123 45 67") доповнюється кодом за замовчуванням,
+    міжнародний префікс "00" замінюється на "+".
+
+    Returns:
+        Optional[str]: Нормалізований номер або None, якщо номер некоректний.
+    """
+    if not phone_number:
+        return None
+    country_code = default_country_code or settings.DEFAULT_COUNTRY_CODE
+    # Розширення ("067 123 45 67 ext 12", "доб. 12") не входять до номера
+    raw = re.split(r"(?i)\s*(?:ext|доб|x|#)", phone_number.strip())[0]
+    digits = re.sub(r"\D", "", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(country_code):
+        pass
+    elif digits.startswith("80") and len(digits) == 11:
+        # Старий міжміський префікс "8" перед національним номером ("8 067 123 45 67")
+        digits = country_code + digits[2:]
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    else:
+        digits = country_code + digits
+    if not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        return None
+    # Українські номери мають рівно 9 цифр після коду країни
+    if digits.startswith("380") and len(digits) != 12:
+        return None
+    return "+" + digits
+
+def _invalidate_phone_lookup(*phone_numbers: Optional[str]):
+    with _phone_lookup_lock:
+        for phone_e164 in phone_numbers:
+            if phone_e164:
+                _phone_lookup_cache.pop(phone_e164, None)
+
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
@@ -28,8 +81,47 @@ def get_contact(db: Session, contact_id: int):
 def get_contacts(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Contact).offset(skip).limit(limit).all()
 
+def get_contact_by_phone(db: Session, phone_number: str):
+    phone_e164 = normalize_phone(phone_number)
+    if phone_e164 is None:
+        return None
+    return db.query(models.Contact).filter(models.Contact.phone_e164 == phone_e164).first()
+
+def lookup_contact_by_phone(db: Session, phone_number: str) -> Optional[dict]:
+    """
+    Зворотний пошук контакту за номером з кешем найчастіших номерів.
+
+    Кеш зберігає дані контакту, тож повторний пошук не звертається до бази.
+    Зміни контакту в цьому процесі одразу скидають запис у кеші, а зміни
+    з інших процесів стають видимими не пізніше ніж через PHONE_LOOKUP_CACHE_TTL_SECONDS.
+
+    Returns:
+        Optional[dict]: Дані контакту або None, якщо контакт не знайдено.
+    """
+    phone_e164 = normalize_phone(phone_number)
+    if phone_e164 is None:
+        return None
+    now = time.monotonic()
+    with _phone_lookup_lock:
+        cached = _phone_lookup_cache.get(phone_e164)
+        if cached is not None and cached[0] > now:
+            _phone_lookup_cache.move_to_end(phone_e164)
+            return dict(cached[1])
+
+    db_contact = get_contact_by_phone(db, phone_e164)
+    if db_contact is None:
+        return None
+    contact_data = schemas.Contact.model_validate(db_contact).model_dump()
+    with _phone_lookup_lock:
+        _phone_lookup_cache[phone_e164] = (now + settings.PHONE_LOOKUP_CACHE_TTL_SECONDS, contact_data)
+        _phone_lookup_cache.move_to_end(phone_e164)
+        while len(_phone_lookup_cache) > settings.PHONE_LOOKUP_CACHE_SIZE:
+            _phone_lookup_cache.popitem(last=False)
+    return dict(contact_data)
+
 def create_contact(db: Session, contact: schemas.ContactCreate):
     db_contact = models.Contact(**contact.dict())
+    db_contact.phone_e164 = normalize_phone(db_contact.phone_number)
     db.add(db_contact)
     db.commit()
     db.refresh(db_contact)
@@ -38,9 +130,12 @@ def create_contact(db: Session, contact: schemas.ContactCreate):
 def update_contact(db: Session, contact_id: int, contact: schemas.ContactUpdate):
     db_contact = get_contact(db, contact_id)
     if db_contact:
+        old_phone_e164 = db_contact.phone_e164
         for key, value in contact.dict(exclude_unset=True).items():
             setattr(db_contact, key, value)
+        db_contact.phone_e164 = normalize_phone(db_contact.phone_number)
         db.commit()
+        _invalidate_phone_lookup(old_phone_e164, db_contact.phone_e164)
         db.refresh(db_contact)
         return db_contact
     return None
@@ -50,6 +145,7 @@ def delete_contact(db: Session, contact_id: int):
     if db_contact:
         db.delete(db_contact)
         db.commit()
+        _invalidate_phone_lookup(db_contact.phone_e164)
         return db_contact
     return None
 
@@ -6,6 +6,7 @@ import os
 from dotenv import load_dotenv
 from src.database.models import Base
 from src.database import DATABASE_URL
+from src.config import settings
 
 load_dotenv()
 
@@ -17,9 +18,19 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Кожна міграція виконується у власній транзакції, щоб migration_helpers могли
+# виходити з неї для CREATE INDEX CONCURRENTLY та пакетних backfill-ів.
+# lock_timeout (settings.MIGRATION_LOCK_TIMEOUT) не дає DDL довго чекати на блокування
+# і зупиняти запис у таблицю.
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        transaction_per_migration=True
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -27,10 +38,15 @@ def run_migrations_online():
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix='sqlalchemy.',
-        poolclass=pool.NullPool
+        poolclass=pool.NullPool,
+        connect_args={'options': f'-c lock_timeout={settings.MIGRATION_LOCK_TIMEOUT}'}
     )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True
+        )
         with context.begin_transaction():
             context.run_migrations()
 
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+redis_client = aioredis.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+
+IN_PROGRESS = "in_progress"
+POLL_INTERVAL_SECONDS = 0.05
+
+# Мітку "в обробці" змінює лише той запит, чий token у ній записаний,
+# тож власник, що втратив ключ, не зітре і не перезапише чужу мітку
+_EXTEND_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['token'] == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['token'] == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_COMPLETE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['token'] == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Посилання на запущені обробники, щоб задача, на яку вже ніхто не чекає
+# (клієнт від'єднався), не була знищена збирачем сміття
+_running = set()
+
+
+def request_fingerprint(payload: str) -> str:
+    """
+    Обчислити відбиток тіла запиту, щоб той самий ключ не використовувався з іншими даними.
+    """
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_key(scope: str, idempotency_key: str) -> str:
+    return f"idempotency:{scope}:{idempotency_key}"
+
+
+async def begin(scope: str, idempotency_key: str, fingerprint: str) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Зареєструвати запит з Idempotency-Key.
+
+    Перший запит із ключем атомарно (SET NX) записує мітку "в обробці" з власним
+    token і має виконати операцію, а потім викликати complete() або abort() з цим token.
+    Повторні запити асинхронно чекають на завершення оригінального, не займаючи
+    потік з пулу, і отримують його збережену відповідь. Якщо оригінальний запит
+    завершився помилкою і зняв мітку, повтор сам стає власником ключа.
+
+    Args:
+        scope (str): Простір ключів, наприклад ідентифікатор користувача та маршрут.
+        idempotency_key (str): Значення заголовка Idempotency-Key.
+        fingerprint (str): Відбиток тіла запиту.
+
+    Returns:
+        Tuple[Optional[str], Optional[dict]]: (token, None), якщо ключ захоплено,
+            або (None, збережена відповідь {"status_code", "body"}).
+
+    Raises:
+        HTTPException: Якщо ключ уже використано з іншим тілом запиту
+            або оригінальний запит не завершився вчасно.
+    """
+    key = _cache_key(scope, idempotency_key)
+    token = uuid.uuid4().hex
+    marker = json.dumps({"state": IN_PROGRESS, "fingerprint": fingerprint, "token": token})
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        if await redis_client.set(key, marker, nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL_SECONDS):
+            return token, None
+        raw = await redis_client.get(key)
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request body",
+                )
+            if entry["state"] != IN_PROGRESS:
+                return None, entry
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def complete(scope: str, idempotency_key: str, token: str, fingerprint: str, status_code: int, body) -> bool:
+    """
+    Зберегти відповідь на запит, щоб повтори отримували її з кешу.
+
+    Args:
+        scope (str): Простір ключів.
+        idempotency_key (str): Значення заголовка Idempotency-Key.
+        token (str): Token, отриманий від begin().
+        fingerprint (str): Відбиток тіла запиту.
+        status_code (int): HTTP-статус відповіді.
+        body: Тіло відповіді, що серіалізується в JSON.
+
+    Returns:
+        bool: False, якщо ключ уже належить іншому запиту і відповідь не збережено.
+    """
+    entry = {"state": "done", "fingerprint": fingerprint, "status_code": status_code, "body": body}
+    stored = await redis_client.eval(
+        _COMPLETE_SCRIPT, 1, _cache_key(scope, idempotency_key), token, json.dumps(entry), settings.IDEMPOTENCY_TTL_SECONDS,
+    )
+    return bool(stored)
+
+
+async def abort(scope: str, idempotency_key: str, token: str) -> bool:
+    """
+    Зняти власну мітку "в обробці", якщо запит завершився помилкою, щоб його можна було повторити.
+
+    Returns:
+        bool: False, якщо ключ уже належить іншому запиту.
+    """
+    return bool(await redis_client.eval(_RELEASE_SCRIPT, 1, _cache_key(scope, idempotency_key), token))
+
+
+async def _keep_alive(key: str, token: str):
+    # Власник ключа продовжує мітку "в обробці", поки виконується запит,
+    # тож повільний запит не втрачає ключ і повтор не виконує його вдруге
+    interval = settings.IDEMPOTENCY_LOCK_TTL_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not await redis_client.eval(_EXTEND_SCRIPT, 1, key, token, settings.IDEMPOTENCY_LOCK_TTL_SECONDS):
+                logger.warning("Idempotency marker %s is no longer owned by this request", key)
+                return
+        except RedisError:
+            logger.warning("Failed to extend idempotency marker %s", key, exc_info=True)
+
+
+async def _run_owned(scope: str, idempotency_key: str, token: str, fingerprint: str, handler: Callable[[], dict]):
+    keep_alive = asyncio.create_task(_keep_alive(_cache_key(scope, idempotency_key), token))
+    try:
+        body = await run_in_threadpool(handler)
+    except Exception:
+        try:
+            await abort(scope, idempotency_key, token)
+        except RedisError:
+            logger.exception("Failed to release Idempotency-Key %s", idempotency_key)
+        raise
+    finally:
+        keep_alive.cancel()
+
+    try:
+        if not await complete(scope, idempotency_key, token, fingerprint, status.HTTP_200_OK, body):
+            logger.warning("Idempotency-Key %s was taken over, response not stored", idempotency_key)
+    except RedisError:
+        logger.exception("Failed to store response for Idempotency-Key %s", idempotency_key)
+    return body
+
+
+def _forget(task: asyncio.Task):
+    _running.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+async def execute(scope: str, idempotency_key: str, fingerprint: str, handler: Callable[[], dict]) -> dict:
+    """
+    Виконати запит не більше одного разу для заданого Idempotency-Key.
+
+    handler виконується в пулі потоків і повертає тіло відповіді, що серіалізується в JSON.
+    Поки він працює, мітка "в обробці" періодично продовжується. Якщо handler
+    завершився помилкою, мітка знімається, щоб клієнт міг повторити запит.
+    Скасування запиту (клієнт від'єднався) не перериває handler, що однаково
+    закомітить запис у потоці, тому його результат зберігається для повторів.
+    Якщо відповідь не вдалося зберегти в Redis, помилка записується в лог,
+    а клієнт однаково отримує відповідь, адже запис у базі вже створено.
+
+    Args:
+        scope (str): Простір ключів.
+        idempotency_key (str): Значення заголовка Idempotency-Key.
+        fingerprint (str): Відбиток тіла запиту.
+        handler (Callable[[], dict]): Операція, яку треба виконати.
+
+    Returns:
+        dict: Відповідь ({"status_code", "body", "replayed"}).
+    """
+    token, cached = await begin(scope, idempotency_key, fingerprint)
+    if cached is not None:
+        return {"status_code": cached["status_code"], "body": cached["body"], "replayed": True}
+
+    task = asyncio.ensure_future(_run_owned(scope, idempotency_key, token, fingerprint, handler))
+    _running.add(task)
+    task.add_done_callback(_forget)
+    body = await asyncio.shield(task)
+    return {"status_code": status.HTTP_200_OK, "body": body, "replayed": False}
@@ -7,7 +7,7 @@ from dotenv import load_dotenv
 import os
 import redis
 
-from . import models, schemas, crud, auth
+from . import models, schemas, crud, auth, contacts
 from .database import SessionLocal, engine
 from .config import settings
 
@@ -35,6 +35,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(contacts.router, dependencies=[Depends(RateLimiter(times=100, seconds=60))])
+
 def get_db():
     """
     Функція для отримання об'єкту сесії бази даних.
@@ -55,7 +57,7 @@ async def startup_event():
 
     Ініціалізує обмеження доступу до API за допомогою Redis.
     """
-    redis_client = redis.StrictRedis(host="localhost", port=6379, db=0)
+    redis_client = redis.StrictRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
     await limiter.init(redis_client)
 
 @app.on_event("shutdown")
@@ -120,24 +122,6 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     """
     return auth.login_for_access_token(form_data, db)
 
-@app.post("/contacts/", response_model=schemas.Contact, dependencies=[Depends(RateLimiter(limit="100/minute"))])
-def create_contact(contact: schemas.ContactCreate, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    """
-    Створення нового контакту.
-
-    Args:
-        contact (schemas.ContactCreate): Об'єкт, що містить дані для створення нового контакту.
-        current_user (schemas.User, optional): Поточний користувач. За замовчуванням отримується через функцію auth.get_current_user.
-        db (Session, optional): Сесія бази даних SQLAlchemy. За замовчуванням отримується через функцію get_db.
-
-    Returns:
-        schemas.Contact: Об'єкт, що містить створений контакт.
-
-    Raises:
-        HTTPException: Якщо обмеження швидкості створення контактів перевищено або користувач не авторизований.
-    """
-    return crud.create_contact(db, contact)
-
 @app.put("/users/avatar/", response_model=schemas.User)
 def update_avatar(avatar_url: str, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
     """
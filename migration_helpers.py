@@ -0,0 +1,179 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+from alembic import op
+from sqlalchemy import text
+
+logger = logging.getLogger("alembic.migration_helpers")
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str], unique: bool = False):
+    """
+    Створити індекс через CREATE INDEX CONCURRENTLY, не блокуючи запис у таблицю.
+
+    CONCURRENTLY не може виконуватися всередині транзакції, тому індекс
+    створюється в autocommit-блоці. Якщо попередня спроба впала або
+    перервалася (наприклад, через lock_timeout), PostgreSQL залишає індекс
+    з тією ж назвою у стані INVALID, і IF NOT EXISTS його б просто пропустив.
+    Тому перед створенням перевіряється pg_index.indisvalid: невалідний індекс
+    видаляється через DROP INDEX CONCURRENTLY і будується заново.
+    В offline-режимі перевірка неможлива, тож генерується лише CREATE INDEX.
+
+    Args:
+        index_name (str): Назва індексу.
+        table_name (str): Назва таблиці.
+        columns (Sequence[str]): Стовпці індексу.
+        unique (bool, optional): Чи є індекс унікальним. За замовчуванням False.
+    """
+    migration_context = op.get_context()
+    with migration_context.autocommit_block():
+        if not migration_context.as_sql and migration_context.dialect.name == "postgresql":
+            is_valid = op.get_bind().execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :index_name AND pg_table_is_visible(c.oid)"
+                ),
+                {"index_name": index_name},
+            ).scalar()
+            if is_valid is False:
+                logger.warning("%s: found INVALID index left by an interrupted build, rebuilding", index_name)
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            index_name,
+            table_name,
+            list(columns),
+            unique=unique,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str):
+    """
+    Видалити індекс через DROP INDEX CONCURRENTLY, не блокуючи запис у таблицю.
+
+    Args:
+        index_name (str): Назва індексу.
+        table_name (str): Назва таблиці.
+    """
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def batched_backfill(
+    table_name: str,
+    where_clause: str,
+    set_clause: Optional[str] = None,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    columns: Sequence[str] = (),
+    batch_size: int = 1000,
+    pause_seconds: float = 0.1,
+    key_column: str = "id",
+    start_after: Optional[Any] = None,
+) -> int:
+    """
+    Заповнити стовпці пакетами, кожен з яких комітиться окремо.
+
+    Значення задаються або SQL-виразом set_clause, або Python-функцією
+    transform, яка отримує рядок (key_column і columns) у вигляді dict
+    і повертає dict з новими значеннями стовпців (завжди з тими самими ключами).
+    Пакети обираються за зростанням key_column, тому він має бути
+    унікальним і впорядковуваним (зазвичай первинний ключ). Між пакетами
+    робиться пауза pause_seconds, щоб не перевантажувати базу та репліки.
+
+    where_clause має відбирати лише ще не заповнені рядки
+    (наприклад, "phone_e164 IS NULL"): тоді перервану міграцію можна просто
+    запустити знову. Після кожного пакета в лог пишеться прогрес і останній
+    ключ, який можна передати у start_after, щоб продовжити з цього місця.
+
+    В offline-режимі (alembic upgrade --sql) для set_clause генерується один
+    UPDATE без пакетів; transform в offline-режимі не підтримується.
+
+    Args:
+        table_name (str): Назва таблиці.
+        where_clause (str): SQL-умова для рядків, які ще треба заповнити.
+        set_clause (Optional[str], optional): SQL-вираз для SET, наприклад "status = 'active'".
+        transform (Optional[Callable], optional): Функція, що обчислює нові значення для рядка.
+        columns (Sequence[str], optional): Стовпці, які читаються для transform.
+        batch_size (int, optional): Розмір пакета. За замовчуванням 1000.
+        pause_seconds (float, optional): Пауза між пакетами в секундах. За замовчуванням 0.1.
+        key_column (str, optional): Стовпець для впорядкування пакетів. За замовчуванням "id".
+        start_after (optional): Обробляти лише рядки, ключ яких більший за це значення.
+
+    Returns:
+        int: Кількість оброблених рядків.
+
+    Raises:
+        ValueError: Якщо не задано рівно один із set_clause та transform.
+        RuntimeError: Якщо transform використовується в offline-режимі.
+    """
+    if (set_clause is None) == (transform is None):
+        raise ValueError("Exactly one of set_clause and transform must be given")
+
+    migration_context = op.get_context()
+    if migration_context.as_sql:
+        if transform is not None:
+            raise RuntimeError("batched_backfill with transform cannot run in offline mode")
+        op.execute(f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}")
+        return 0
+
+    last_key = start_after
+    processed = 0
+    started = time.monotonic()
+    with migration_context.autocommit_block():
+        connection = op.get_bind()
+        while True:
+            condition = f"({where_clause})"
+            if last_key is not None:
+                condition = f"{key_column} > :last_key AND {condition}"
+            params = {"last_key": last_key, "batch_size": batch_size}
+            if transform is None:
+                keys = [
+                    row[0]
+                    for row in connection.execute(
+                        text(
+                            f"UPDATE {table_name} SET {set_clause} "
+                            f"WHERE {key_column} IN ("
+                            f"SELECT {key_column} FROM {table_name} WHERE {condition} "
+                            f"ORDER BY {key_column} LIMIT :batch_size"
+                            f") RETURNING {key_column}"
+                        ),
+                        params,
+                    )
+                ]
+            else:
+                keys = _transform_batch(connection, table_name, key_column, columns, condition, params, transform)
+            if not keys:
+                break
+            last_key = max(keys)
+            processed += len(keys)
+            elapsed = time.monotonic() - started
+            logger.info(
+                "%s: backfilled %d rows (last %s=%s, %.0f rows/s)",
+                table_name, processed, key_column, last_key, processed / elapsed if elapsed else 0,
+            )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    logger.info("%s: backfill finished, %d rows processed", table_name, processed)
+    return processed
+
+
+def _transform_batch(connection, table_name, key_column, columns, condition, params, transform):
+    selected = ", ".join([key_column, *columns])
+    rows = connection.execute(
+        text(
+            f"SELECT {selected} FROM {table_name} WHERE {condition} "
+            f"ORDER BY {key_column} LIMIT :batch_size"
+        ),
+        params,
+    ).mappings().all()
+    if not rows:
+        return []
+    updates = [{**transform(dict(row)), "backfill_key": row[key_column]} for row in rows]
+    assignments = ", ".join(f"{column} = :{column}" for column in updates[0] if column != "backfill_key")
+    connection.execute(
+        text(f"UPDATE {table_name} SET {assignments} WHERE {key_column} = :backfill_key"),
+        updates,
+    )
+    return [row[key_column] for row in rows]
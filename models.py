@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Boolean, Column, Integer, String, Date
 from .database import Base
 
 
@@ -10,7 +10,9 @@ class Contact(Base):
     last_name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
     phone_number = Column(String, index=True)
-    birth_date = Column(Date)
+    phone_e164 = Column(String, index=True, nullable=True)
+    # Атрибут називається як поле схем, а стовпець у базі залишається birth_date
+    birthday = Column("birth_date", Date)
     additional_info = Column(String, nullable=True)
 
 class User(Base):
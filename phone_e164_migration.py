@@ -0,0 +1,49 @@
+import logging
+from alembic import op
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Column, String, create_engine, inspect, pool
+from .crud import normalize_phone
+from .config import settings
+from .migration_helpers import batched_backfill, create_index_concurrently
+
+def _normalize_row(row: dict) -> dict:
+    return {"phone_e164": normalize_phone(row["phone_number"])}
+
+
+def upgrade(connection):
+    """
+    Додати до contacts стовпець phone_e164, заповнити його та проіндексувати без простою.
+
+    Кожен крок можна безпечно повторити: стовпець додається лише якщо його ще немає,
+    backfill обробляє лише незаповнені рядки, а індекс перебудовується, якщо
+    попередня спроба залишила його невалідним.
+
+    Args:
+        connection: З'єднання SQLAlchemy без відкритої транзакції.
+    """
+    migration_context = MigrationContext.configure(connection)
+    with Operations.context(migration_context):
+        with connection.begin():
+            columns = [column["name"] for column in inspect(connection).get_columns("contacts")]
+            if "phone_e164" not in columns:
+                # Стовпець без значення за замовчуванням додається без перезапису таблиці
+                op.add_column("contacts", Column("phone_e164", String, nullable=True))
+        batched_backfill(
+            "contacts",
+            "phone_e164 IS NULL AND phone_number IS NOT NULL",
+            transform=_normalize_row,
+            columns=["phone_number"],
+        )
+        create_index_concurrently("ix_contacts_phone_e164", "contacts", ["phone_e164"])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=pool.NullPool,
+        connect_args={"options": f"-c lock_timeout={settings.MIGRATION_LOCK_TIMEOUT}"},
+    )
+    with engine.connect() as connection:
+        upgrade(connection)
@@ -21,6 +21,25 @@ class ContactCreate(BaseModel):
     birthday: date
     additional_info: Optional[str] = None
 
+class ContactUpdate(BaseModel):
+    """
+    Схема для оновлення контакту. Передаються лише поля, які треба змінити.
+
+    Attributes:
+        first_name (Optional[str], optional): Ім'я контакту.
+        last_name (Optional[str], optional): Прізвище контакту.
+        email (Optional[EmailStr], optional): Електронна адреса контакту.
+        phone_number (Optional[str], optional): Номер телефону контакту.
+        birthday (Optional[date], optional): Дата народження контакту.
+        additional_info (Optional[str], optional): Додаткова інформація про контакт.
+    """
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
+
 class Contact(BaseModel):
     """
     Схема для відображення контакту.
@@ -35,7 +54,7 @@ class Contact(BaseModel):
         additional_info (Optional[str], optional): Додаткова інформація про контакт.
 
     Config:
-        orm_mode (bool): Показує, що модель може бути отримана напряму з ORM.
+        from_attributes (bool): Показує, що модель може бути отримана напряму з ORM.
     """
     id: int
     first_name: str
@@ -46,7 +65,7 @@ class Contact(BaseModel):
     additional_info: Optional[str] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class UserCreate(BaseModel):
     """
@@ -69,14 +88,14 @@ class User(BaseModel):
         is_verified (bool): Показує, чи верифікований користувач.
 
     Config:
-        orm_mode (bool): Показує, що модель може бути отримана напряму з ORM.
+        from_attributes (bool): Показує, що модель може бути отримана напряму з ORM.
     """
     id: int
     email: EmailStr
     is_verified: bool
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class Token(BaseModel):
     """
@@ -0,0 +1,110 @@
+from datetime import date
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, pool
+from sqlalchemy.orm import sessionmaker
+from app import auth, contacts, crud, database, idempotency, models
+from app.test_unit_idempotency import FakeRedis
+from app.database import Base
+
+# Тестова база даних у пам'яті
+engine = create_engine("sqlite://", poolclass=pool.StaticPool, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def override_get_current_user():
+    return models.User(id=1, email="owner@example.com")
+
+app = FastAPI()
+app.include_router(contacts.router)
+app.dependency_overrides[database.get_db] = override_get_db
+app.dependency_overrides[auth.get_current_user] = override_get_current_user
+
+client = TestClient(app)
+
+def setup_function():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    crud._phone_lookup_cache.clear()
+
+def test_lookup_contact_by_phone():
+    """
+    Тестує зворотний пошук контакту за номером через маршрут /contacts/lookup/.
+
+    """
+    db = TestingSessionLocal()
+    db.add(models.Contact(
+        first_name="Test",
+        last_name="Contact",
+        email="contact@example.com",
+        phone_number="+380 67 123-45-67",
+        phone_e164=crud.normalize_phone("+380 67 123-45-67", "380"),
+        birthday=date(1990, 1, 1),
+    ))
+    db.commit()
+    db.close()
+
+    for phone in ["067 123 45 67", "+380671234567"]:
+        response = client.get("/contacts/lookup/", params={"phone": phone})
+        assert response.status_code == 200
+        assert response.json()["email"] == "contact@example.com"
+        assert response.json()["birthday"] == "1990-01-01"
+
+def test_lookup_contact_by_phone_not_found():
+    """
+    Тестує, що пошук невідомого номера повертає 404.
+
+    """
+    response = client.get("/contacts/lookup/", params={"phone": "0501112233"})
+    assert response.status_code == 404
+
+contact_data = {
+    "first_name": "New",
+    "last_name": "Contact",
+    "email": "new@example.com",
+    "phone_number": "067 765 43 21",
+    "birthday": "1992-03-04",
+}
+
+def count_contacts():
+    db = TestingSessionLocal()
+    try:
+        return db.query(models.Contact).count()
+    finally:
+        db.close()
+
+def test_create_contact_with_idempotency_key_is_replayed():
+    """
+    Тестує, що повтор POST /contacts/ з тим самим Idempotency-Key не створює новий контакт.
+
+    """
+    headers = {"Idempotency-Key": "retry-1"}
+    with patch.object(idempotency, "redis_client", FakeRedis()):
+        first = client.post("/contacts/", json=contact_data, headers=headers)
+        second = client.post("/contacts/", json=contact_data, headers=headers)
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.content == second.content
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert count_contacts() == 1
+
+def test_create_contact_serialized_the_same_with_and_without_key():
+    """
+    Тестує, що відповідь POST /contacts/ однакова з Idempotency-Key і без нього.
+
+    """
+    with patch.object(idempotency, "redis_client", FakeRedis()):
+        keyed = client.post("/contacts/", json=contact_data, headers={"Idempotency-Key": "retry-2"})
+    plain = client.post("/contacts/", json=dict(contact_data, email="plain@example.com"))
+    assert plain.status_code == 200
+    assert keyed.status_code == 200
+    assert {**keyed.json(), "id": None, "email": None} == {**plain.json(), "id": None, "email": None}
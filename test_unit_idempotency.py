@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from app import idempotency
+
+class FakeRedis:
+    """
+    Заміна Redis у пам'яті; eval відтворює Lua-скрипти модуля idempotency.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expire_calls = 0
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def eval(self, script, numkeys, key, token, *args):
+        raw = self.data.get(key)
+        if raw is None or json.loads(raw).get("token") != token:
+            return 0
+        if script == idempotency._EXTEND_SCRIPT:
+            self.expire_calls += 1
+        elif script == idempotency._RELEASE_SCRIPT:
+            del self.data[key]
+        else:
+            self.data[key] = args[0].encode()
+        return 1
+
+
+class TestIdempotency(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.patches = [
+            patch.object(idempotency, "redis_client", self.redis),
+            patch.multiple(
+                idempotency.settings,
+                IDEMPOTENCY_TTL_SECONDS=60,
+                IDEMPOTENCY_WAIT_SECONDS=1,
+                IDEMPOTENCY_LOCK_TTL_SECONDS=60,
+            ),
+            patch.object(idempotency, "POLL_INTERVAL_SECONDS", 0.01),
+        ]
+        for p in self.patches:
+            p.start()
+        self.key = idempotency._cache_key("contacts:1", "key-1")
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+
+    def entry(self):
+        return json.loads(self.redis.data[self.key])
+
+    def mark_in_progress(self, fingerprint="fp", token="other-token"):
+        self.redis.data[self.key] = json.dumps(
+            {"state": idempotency.IN_PROGRESS, "fingerprint": fingerprint, "token": token}
+        ).encode()
+
+    async def test_first_request_claims_key(self):
+        token, cached = await idempotency.begin("contacts:1", "key-1", "fp")
+        self.assertIsNone(cached)
+        self.assertEqual(self.entry()["state"], idempotency.IN_PROGRESS)
+        self.assertEqual(self.entry()["token"], token)
+
+    async def test_retry_is_replayed_from_cache(self):
+        handler = MagicMock(return_value={"id": 1})
+        first = await idempotency.execute("contacts:1", "key-1", "fp", handler)
+        second = await idempotency.execute("contacts:1", "key-1", "fp", handler)
+        handler.assert_called_once()
+        self.assertEqual(first, {"status_code": 200, "body": {"id": 1}, "replayed": False})
+        self.assertEqual(second, {"status_code": 200, "body": {"id": 1}, "replayed": True})
+
+    async def test_concurrent_duplicate_waits_for_original(self):
+        calls = []
+
+        def handler():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"id": 1}
+
+        first, second = await asyncio.gather(
+            idempotency.execute("contacts:1", "key-1", "fp", handler),
+            idempotency.execute("contacts:1", "key-1", "fp", handler),
+        )
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first["body"], second["body"])
+        self.assertEqual(sorted([first["replayed"], second["replayed"]]), [False, True])
+
+    async def test_wait_times_out_with_409(self):
+        self.mark_in_progress()
+        with patch.object(idempotency.settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05):
+            with self.assertRaises(HTTPException) as error:
+                await idempotency.begin("contacts:1", "key-1", "fp")
+        self.assertEqual(error.exception.status_code, 409)
+
+    async def test_released_key_is_claimed_by_waiting_retry(self):
+        self.mark_in_progress()
+        asyncio.get_running_loop().call_later(0.03, self.redis.data.pop, self.key)
+        token, cached = await idempotency.begin("contacts:1", "key-1", "fp")
+        self.assertIsNone(cached)
+        self.assertEqual(self.entry()["token"], token)
+
+    async def test_different_body_is_rejected_with_422(self):
+        self.mark_in_progress(fingerprint="other")
+        with self.assertRaises(HTTPException) as error:
+            await idempotency.begin("contacts:1", "key-1", "fp")
+        self.assertEqual(error.exception.status_code, 422)
+
+    async def test_failed_request_releases_key(self):
+        handler = MagicMock(side_effect=ValueError("duplicate email"))
+        with self.assertRaises(ValueError):
+            await idempotency.execute("contacts:1", "key-1", "fp", handler)
+        self.assertNotIn(self.key, self.redis.data)
+
+        handler = MagicMock(return_value={"id": 1})
+        result = await idempotency.execute("contacts:1", "key-1", "fp", handler)
+        handler.assert_called_once()
+        self.assertFalse(result["replayed"])
+
+    async def test_stale_owner_cannot_touch_new_claim(self):
+        self.mark_in_progress(token="new-owner")
+        self.assertFalse(await idempotency.abort("contacts:1", "key-1", "stale-owner"))
+        self.assertFalse(await idempotency.complete("contacts:1", "key-1", "stale-owner", "fp", 200, {"id": 1}))
+        self.assertEqual(self.entry()["token"], "new-owner")
+        self.assertEqual(self.entry()["state"], idempotency.IN_PROGRESS)
+
+    async def test_redis_failure_after_commit_still_returns_body(self):
+        with patch.object(idempotency, "complete", side_effect=RedisError("connection lost")):
+            result = await idempotency.execute("contacts:1", "key-1", "fp", MagicMock(return_value={"id": 1}))
+        self.assertEqual(result["body"], {"id": 1})
+
+    async def test_marker_is_extended_while_request_runs(self):
+        with patch.object(idempotency.settings, "IDEMPOTENCY_LOCK_TTL_SECONDS", 0.03):
+            await idempotency.execute("contacts:1", "key-1", "fp", lambda: time.sleep(0.1) or {"id": 1})
+        self.assertGreater(self.redis.expire_calls, 0)
+        self.assertEqual(self.entry()["state"], "done")
+
+    async def test_cancelled_request_still_stores_result(self):
+        with patch.object(idempotency.settings, "IDEMPOTENCY_LOCK_TTL_SECONDS", 0.03):
+            task = asyncio.create_task(
+                idempotency.execute("contacts:1", "key-1", "fp", lambda: time.sleep(0.15) or {"id": 1})
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.2)
+            self.assertEqual(self.entry()["state"], "done")
+            self.assertFalse(idempotency._running)
+            expire_calls = self.redis.expire_calls
+            await asyncio.sleep(0.1)
+            self.assertEqual(self.redis.expire_calls, expire_calls)
+
+        handler = MagicMock()
+        result = await idempotency.execute("contacts:1", "key-1", "fp", handler)
+        handler.assert_not_called()
+        self.assertEqual(result, {"status_code": 200, "body": {"id": 1}, "replayed": True})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import unittest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, text
+from app.migration_helpers import batched_backfill, create_index_concurrently
+
+class TestBatchedBackfill(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.connection = self.engine.connect()
+        self.connection.execute(text("CREATE TABLE contacts (id INTEGER PRIMARY KEY, phone_number VARCHAR, phone_e164 VARCHAR)"))
+        self.connection.execute(
+            text("INSERT INTO contacts (id, phone_number) VALUES (:id, :phone_number)"),
+            [{"id": contact_id, "phone_number": f"067{contact_id:07d}"} for contact_id in range(1, 8)],
+        )
+        self.connection.commit()
+        self.migration_context = MigrationContext.configure(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def backfill(self, **kwargs):
+        with Operations.context(self.migration_context):
+            return batched_backfill("contacts", "phone_e164 IS NULL", pause_seconds=0, **kwargs)
+
+    def filled_ids(self):
+        return [row[0] for row in self.connection.execute(text("SELECT id FROM contacts WHERE phone_e164 IS NOT NULL ORDER BY id"))]
+
+    def test_set_clause_in_batches(self):
+        processed = self.backfill(set_clause="phone_e164 = '+380' || substr(phone_number, 2)", batch_size=3)
+        self.assertEqual(processed, 7)
+        self.assertEqual(self.filled_ids(), list(range(1, 8)))
+        phone_e164 = self.connection.execute(text("SELECT phone_e164 FROM contacts WHERE id = 1")).scalar()
+        self.assertEqual(phone_e164, "+380670000001")
+
+    def test_transform_in_batches(self):
+        seen = []
+
+        def transform(row):
+            seen.append(row["id"])
+            return {"phone_e164": "+380" + row["phone_number"][1:]}
+
+        processed = self.backfill(transform=transform, columns=["phone_number"], batch_size=2)
+        self.assertEqual(processed, 7)
+        self.assertEqual(seen, list(range(1, 8)))
+        self.assertEqual(self.filled_ids(), list(range(1, 8)))
+
+    def test_transform_skips_rows_it_cannot_fill(self):
+        processed = self.backfill(transform=lambda row: {"phone_e164": None}, columns=["phone_number"], batch_size=3)
+        self.assertEqual(processed, 7)
+        self.assertEqual(self.filled_ids(), [])
+
+    def test_resume_with_start_after(self):
+        processed = self.backfill(set_clause="phone_e164 = phone_number", batch_size=2, start_after=4)
+        self.assertEqual(processed, 3)
+        self.assertEqual(self.filled_ids(), [5, 6, 7])
+
+    def test_rerun_only_touches_unfilled_rows(self):
+        self.backfill(set_clause="phone_e164 = phone_number", start_after=5)
+        processed = self.backfill(set_clause="phone_e164 = phone_number", batch_size=2)
+        self.assertEqual(processed, 5)
+        self.assertEqual(self.filled_ids(), list(range(1, 8)))
+
+    def test_requires_exactly_one_of_set_clause_and_transform(self):
+        with self.assertRaises(ValueError):
+            self.backfill()
+        with self.assertRaises(ValueError):
+            self.backfill(set_clause="phone_e164 = phone_number", transform=lambda row: row)
+
+
+class TestOfflineMode(unittest.TestCase):
+
+    def setUp(self):
+        self.output = io.StringIO()
+        self.migration_context = MigrationContext.configure(
+            dialect_name="postgresql",
+            opts={"as_sql": True, "output_buffer": self.output},
+        )
+
+    def test_backfill_emits_single_update(self):
+        with Operations.context(self.migration_context):
+            processed = batched_backfill("contacts", "phone_e164 IS NULL", set_clause="phone_e164 = phone_number")
+        self.assertEqual(processed, 0)
+        self.assertIn("UPDATE contacts SET phone_e164 = phone_number WHERE phone_e164 IS NULL", self.output.getvalue())
+
+    def test_backfill_with_transform_is_rejected(self):
+        with Operations.context(self.migration_context):
+            with self.assertRaises(RuntimeError):
+                batched_backfill("contacts", "phone_e164 IS NULL", transform=lambda row: row)
+
+    def test_create_index_outside_transaction(self):
+        with Operations.context(self.migration_context):
+            create_index_concurrently("ix_contacts_phone_e164", "contacts", ["phone_e164"])
+        sql = self.output.getvalue()
+        self.assertIn("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_phone_e164 ON contacts (phone_e164)", sql)
+        self.assertLess(sql.index("COMMIT"), sql.index("CREATE INDEX"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import time
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, inspect, pool, text
+from sqlalchemy.orm import sessionmaker
+from app import crud, models, schemas
+from app.crud import normalize_phone
+from app.database import Base
+from app.phone_e164_migration import upgrade
+
+class TestNormalizePhone(unittest.TestCase):
+
+    def test_formatting_variants_share_e164(self):
+        variants = [
+            "+380 67 123-45-67",
+            "067 123 45 67",
+            "00380671234567",
+            "380671234567",
+            "(067)1234567",
+            "8 067 123 45 67",
+            "067 123 45 67 ext 12",
+            "+380671234567 доб. 3",
+            "067-123-45-67#5",
+        ]
+        for phone_number in variants:
+            self.assertEqual(normalize_phone(phone_number, "380"), "+380671234567", phone_number)
+
+    def test_foreign_number_keeps_country_code(self):
+        self.assertEqual(normalize_phone("+1 (415) 555-2671", "380"), "+14155552671")
+
+    def test_invalid_number(self):
+        self.assertIsNone(normalize_phone("12", "380"))
+        self.assertIsNone(normalize_phone("+38080671234567", "380"))
+        self.assertIsNone(normalize_phone("", "380"))
+        self.assertIsNone(normalize_phone(None, "380"))
+
+class TestPhoneLookupCache(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=pool.StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.contact = models.Contact(
+            first_name="Test",
+            last_name="Contact",
+            email="contact@example.com",
+            phone_number="+380 67 123-45-67",
+            phone_e164="+380671234567",
+            birthday=date(1990, 1, 1),
+        )
+        self.db.add(self.contact)
+        self.db.commit()
+        crud._phone_lookup_cache.clear()
+        self.settings = patch.multiple(
+            crud.settings, DEFAULT_COUNTRY_CODE="380", PHONE_LOOKUP_CACHE_SIZE=2, PHONE_LOOKUP_CACHE_TTL_SECONDS=60,
+        )
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        self.db.close()
+
+    def test_hit_does_not_query_database(self):
+        self.assertEqual(crud.lookup_contact_by_phone(self.db, "067 123 45 67")["id"], self.contact.id)
+        db = MagicMock()
+        contact_data = crud.lookup_contact_by_phone(db, "0671234567")
+        self.assertEqual(contact_data["email"], "contact@example.com")
+        db.query.assert_not_called()
+
+    def test_expired_entry_is_reloaded(self):
+        crud.lookup_contact_by_phone(self.db, "0671234567")
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        with patch.object(crud.time, "monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(crud.lookup_contact_by_phone(db, "0671234567"))
+        db.query.assert_called_once()
+
+    def test_least_recently_used_is_evicted(self):
+        for contact_id, phone_number in [(2, "0500000002"), (3, "0500000003")]:
+            self.db.add(models.Contact(
+                id=contact_id,
+                first_name="Test",
+                last_name=str(contact_id),
+                email=f"{contact_id}@example.com",
+                phone_number=phone_number,
+                phone_e164=normalize_phone(phone_number),
+                birthday=date(1990, 1, 1),
+            ))
+        self.db.commit()
+        for phone_number in ["0671234567", "0500000002", "0671234567", "0500000003"]:
+            crud.lookup_contact_by_phone(self.db, phone_number)
+        self.assertEqual(list(crud._phone_lookup_cache), ["+380671234567", "+380500000003"])
+
+    def test_cached_data_matches_contact_schema(self):
+        contact_data = crud.lookup_contact_by_phone(self.db, "0671234567")
+        self.assertEqual(schemas.Contact.model_validate(contact_data).birthday, date(1990, 1, 1))
+
+    def test_update_changes_birthday(self):
+        crud.update_contact(self.db, self.contact.id, schemas.ContactUpdate(birthday=date(1991, 2, 3)))
+        stored = self.db.execute(text("SELECT birth_date FROM contacts")).scalar()
+        self.assertEqual(str(stored), "1991-02-03")
+
+    def test_update_invalidates_old_and_new_number(self):
+        crud.lookup_contact_by_phone(self.db, "0671234567")
+        crud.update_contact(self.db, self.contact.id, schemas.ContactUpdate(phone_number="(050) 765 43 21"))
+        self.assertEqual(self.contact.phone_e164, "+380507654321")
+        self.assertIsNone(crud.lookup_contact_by_phone(self.db, "0671234567"))
+        self.assertEqual(crud.lookup_contact_by_phone(self.db, "+380507654321")["id"], self.contact.id)
+
+    def test_delete_invalidates_number(self):
+        crud.lookup_contact_by_phone(self.db, "0671234567")
+        crud.delete_contact(self.db, self.contact.id)
+        self.assertIsNone(crud.lookup_contact_by_phone(self.db, "0671234567"))
+
+class TestPhoneE164Migration(unittest.TestCase):
+
+    def test_upgrade_adds_backfills_and_indexes_column(self):
+        engine = create_engine("sqlite://", poolclass=pool.StaticPool)
+        with engine.connect() as connection:
+            connection.execute(text("CREATE TABLE contacts (id INTEGER PRIMARY KEY, phone_number VARCHAR)"))
+            connection.execute(text("INSERT INTO contacts (id, phone_number) VALUES (1, '067 123 45 67'), (2, NULL), (3, '12')"))
+            connection.commit()
+            with patch.object(crud.settings, "DEFAULT_COUNTRY_CODE", "380"):
+                upgrade(connection)
+                upgrade(connection)
+            rows = connection.execute(text("SELECT id, phone_e164 FROM contacts ORDER BY id")).all()
+            indexes = [index["name"] for index in inspect(connection).get_indexes("contacts")]
+        self.assertEqual(rows, [(1, "+380671234567"), (2, None), (3, None)])
+        self.assertIn("ix_contacts_phone_e164", indexes)
+
+if __name__ == '__main__':
+    unittest.main()